@@ -5,7 +5,9 @@ class Settings(BaseSettings):
     risk_free_rate: float = 0.045
     dividend_yield: float = 0.0
     cache_ttl_seconds: int = 60
+    expirations_cache_ttl_seconds: int = 3600  # Listed expirations change at most daily
     allowed_origins: str = "http://localhost:5173"
+    debug: bool = False  # Enables /api/debug
 
     class Config:
         env_file = "backend/.env"
@@ -1,255 +1,448 @@
-from typing import Dict, List, Tuple, Optional
-from collections import defaultdict
+import logging
+from collections.abc import ItemsView, Mapping, ValuesView
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Tuple, Optional, Union
+import math
 import numpy as np
+from numba import b1, f8, guvectorize, njit
 from backend.models import Exposures, OptionContract, Greeks, StrikeData, Regime
-from backend.greeks import calculate_greeks, calculate_time_to_expiration
+from backend.greeks import _FASTMATH, _bs_kernel, calculate_T_batch
+
+logger = logging.getLogger(__name__)
+
+def _sanitize(values: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    # Clamp Greeks to reasonable ranges in place, NaN/inf become 0
+    np.nan_to_num(values, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return np.clip(values, lo, hi, out=values)
+
+def _optional_column(contracts: List[OptionContract], field: str) -> np.ndarray:
+    # Missing values become NaN so they can be sanitized in one pass
+    return np.fromiter(
+        (np.nan if (v := getattr(c, field)) is None else v for c in contracts),
+        dtype=np.float64, count=len(contracts)
+    )
+
+def _expiration_column(contracts: List[OptionContract]) -> np.ndarray:
+    dates = [c.expiration_date for c in contracts]
+    try:
+        return np.array(dates, dtype="datetime64[D]")
+    except ValueError:
+        # Parse unique dates one by one so a bad date only blanks its own rows
+        parsed = {}
+        for date in set(dates):
+            try:
+                parsed[date] = np.datetime64(date, "D")
+            except ValueError:
+                parsed[date] = np.datetime64("NaT", "D")
+        return np.array([parsed[date] for date in dates], dtype="datetime64[D]")
+
+def _contract_columns(contracts: List[OptionContract]) -> Dict[str, np.ndarray]:
+    # One pass over the models; everything downstream works on these arrays
+    n = len(contracts)
+    columns = {
+        field: _optional_column(contracts, field)
+        for field in ("delta", "gamma", "theta", "vega", "implied_volatility")
+    }
+    columns["strike"] = np.fromiter((c.strike for c in contracts), dtype=np.float64, count=n)
+    columns["is_call"] = np.fromiter((c.is_call for c in contracts), dtype=bool, count=n)
+    columns["open_interest"] = np.fromiter(
+        (c.open_interest or 0 for c in contracts), dtype=np.float64, count=n
+    )
+    columns["expiration"] = _expiration_column(contracts)
+    return columns
+
+def _broker_greeks(
+    columns: Dict[str, np.ndarray],
+    T: np.ndarray
+) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    # Use provided Greeks with validation and defaults for missing values
+    delta = _sanitize(columns["delta"].copy(), -5.0, 5.0)
+    gamma = _sanitize(columns["gamma"].copy(), -1.0, 1.0)
+    theta = _sanitize(columns["theta"].copy(), -10.0, 10.0)
+    vega = _sanitize(columns["vega"].copy(), -10.0, 10.0)
+
+    # Convert theta to charm (dDelta/dt per year), with validation
+    charm = _sanitize(np.where(np.abs(theta) > 0.001, -theta / 365.25, 0.0), -10.0, 10.0)
+
+    # Estimate vanna from vega and gamma, with validation
+    vanna = _sanitize(
+        np.where(np.abs(vega) > 0.001, vega * 0.1, gamma * np.sqrt(np.maximum(T, 0.0))),
+        -10.0, 10.0
+    )
+
+    greeks = {"delta": delta, "gamma": gamma, "vanna": vanna, "charm": charm}
+
+    # If we have at least basic Greeks, use them; otherwise fall back to Black-Scholes
+    needs_bs = ~((np.abs(delta) > 0.001) | (np.abs(gamma) > 0.0001))  # More meaningful threshold
+    return greeks, needs_bs
+
+class ExposureMultipliers(NamedTuple):
+    """Per-spot exposure multipliers with the 1% move normalization applied"""
+    gex: float  # S^2 * 0.01 * 100
+    dvc: float  # S * 0.01 * 100, shared by DEX/VEX/CEX
+
+def exposure_multipliers(spot_price: float) -> ExposureMultipliers:
+    return ExposureMultipliers(
+        gex=(spot_price * spot_price) * 0.01 * 100,
+        dvc=spot_price * 0.01 * 100
+    )
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _clamp(x: float, lo: float, hi: float) -> float:
+    # _sanitize for one value: NaN/inf become 0
+    if not math.isfinite(x):
+        return 0.0
+    return min(max(x, lo), hi)
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _finite(x: float) -> float:
+    return x if math.isfinite(x) else 0.0
+
+@guvectorize(
+    [(f8, f8, f8, f8, b1, f8, f8, f8, b1, f8, f8, f8, f8, f8, f8,
+      f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:])],
+    "(),(),(),(),(),(),(),(),(),(),(),(),(),(),()->(),(),(),(),(),(),(),()",
+    target="cpu", cache=True, fastmath=_FASTMATH
+)
+def _contract_exposures(
+    broker_delta, broker_gamma, broker_vanna, broker_charm, needs_bs,
+    K, T, sigma, is_call, open_interest, S, r, q, gex_mult, dvc_mult,
+    delta, gamma, vanna, charm, gex, dex, vex, cex
+):
+    # Black-Scholes fallback for contracts without usable broker Greeks,
+    # validated like the broker values
+    if needs_bs:
+        d, g, v, c = _bs_kernel(S, K, T, r, q, sigma, is_call)
+        delta[0] = _clamp(d, -5.0, 5.0)
+        gamma[0] = _clamp(g, -1.0, 1.0)
+        vanna[0] = _clamp(v, -10.0, 10.0)
+        charm[0] = _clamp(c, -10.0, 10.0)
+    else:
+        delta[0] = broker_delta
+        gamma[0] = broker_gamma
+        vanna[0] = broker_vanna
+        charm[0] = broker_charm
+
+    # MM sign convention: MM exposure = -OI * greek, negative OI contributes nothing
+    oi = max(open_interest, 0.0)
+    base = oi * -dvc_mult
+    gex[0] = _finite((oi * -gex_mult) * gamma[0])
+    dex[0] = _finite(base * delta[0])
+    vex[0] = _finite(base * vanna[0])
+    cex[0] = _finite(base * charm[0])
+
+def _batch_exposures(
+    contracts: List[OptionContract],
+    columns: Dict[str, np.ndarray],
+    spot_price: float,
+    risk_free_rate: float,
+    dividend_yield: float,
+    multipliers: ExposureMultipliers,
+    log_skipped: bool = True
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Greeks and exposures for a batch as parallel arrays, from one compiled loop
+    over the chain. Contracts without usable broker Greeks are priced with
+    Black-Scholes inside the loop.
+    """
+    # Snapshot the clock once so every contract in the batch shares it
+    now = np.datetime64(datetime.now())
+    T = calculate_T_batch(columns["expiration"], now)
+
+    broker, needs_bs = _broker_greeks(columns, T)
+
+    # Validated IV for the Black-Scholes fallback
+    iv = columns["implied_volatility"]
+    sigma = np.where((iv > 0) & (iv < 5.0), iv, 0.20)
+
+    delta, gamma, vanna, charm, gex, dex, vex, cex = _contract_exposures(
+        broker["delta"], broker["gamma"], broker["vanna"], broker["charm"], needs_bs,
+        columns["strike"], T, sigma, columns["is_call"], columns["open_interest"],
+        spot_price, risk_free_rate, dividend_yield, multipliers.gex, multipliers.dvc
+    )
+
+    if log_skipped and logger.isEnabledFor(logging.DEBUG):
+        for i in np.flatnonzero(needs_bs):
+            contract, value = contracts[i], iv[i]
+            if np.isnan(value):
+                logger.debug("Skipping contract %s@%s - missing IV, using 0.20 default", contract.symbol, contract.strike)
+            elif not (0 < value < 5.0):
+                logger.debug("Invalid IV %s for %s@%s, using 0.20 default", value, contract.symbol, contract.strike)
+
+    greeks = {"delta": delta, "gamma": gamma, "vanna": vanna, "charm": charm}
+    exposures = {"gex": gex, "dex": dex, "vex": vex, "cex": cex}
+    return greeks, exposures
+
+def calculate_batch_greeks(
+    contracts: List[OptionContract],
+    spot_price: float,
+    risk_free_rate: float,
+    dividend_yield: float,
+    log_skipped: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    Greeks for a batch of contracts as parallel arrays. Contracts without usable
+    broker Greeks are priced with the compiled Black-Scholes kernel.
+    """
+    greeks, _ = _batch_exposures(
+        contracts, _contract_columns(contracts), spot_price, risk_free_rate,
+        dividend_yield, exposure_multipliers(spot_price), log_skipped
+    )
+    return greeks
 
 def calculate_contract_exposures(
     contract: OptionContract,
     spot_price: float,
     risk_free_rate: float,
     dividend_yield: float,
-    log_skipped: bool = True
+    log_skipped: bool = True,
+    multipliers: Optional[ExposureMultipliers] = None
 ) -> Tuple[Exposures, Greeks]:
 
-    # Calculate time to expiration
-    T = calculate_time_to_expiration(contract.expiration_date)
+    # A single contract is a batch of one
+    greeks, exposures = _batch_exposures(
+        [contract], _contract_columns([contract]), spot_price, risk_free_rate,
+        dividend_yield, multipliers or exposure_multipliers(spot_price), log_skipped
+    )
 
-    # Use provided Greeks with validation and defaults for missing values
-    delta = contract.delta if contract.delta is not None else 0.0
-    gamma = contract.gamma if contract.gamma is not None else 0.0
-    theta = contract.theta if contract.theta is not None else 0.0
-    vega = contract.vega if contract.vega is not None else 0.0
-
-    # Validate and clamp Greeks to reasonable ranges, handle NaN/inf
-    def validate_greek(value, min_val, max_val, default=0.0):
-        if value is None or np.isnan(value) or np.isinf(value):
-            return default
-        return max(min_val, min(max_val, value))
-
-    delta = validate_greek(delta, -5.0, 5.0)
-    gamma = validate_greek(gamma, -1.0, 1.0)
-    theta = validate_greek(theta, -10.0, 10.0)
-    vega = validate_greek(vega, -10.0, 10.0)
-
-    # If we have at least basic Greeks, use them with defaults for missing ones
-    if abs(delta) > 0.001 or abs(gamma) > 0.0001:  # More meaningful threshold
-        # Convert theta to charm (dDelta/dt per year), with validation
-        charm = validate_greek(-theta / 365.25 if abs(theta) > 0.001 else 0.0, -10.0, 10.0)
-
-        # Estimate vanna from vega and gamma, with validation
-        vanna_estimate = vega * 0.1 if abs(vega) > 0.001 else (gamma * np.sqrt(T) if T > 0 else 0.0)
-        vanna = validate_greek(vanna_estimate, -10.0, 10.0)
-
-        greeks = Greeks(
-            delta=delta,
-            gamma=gamma,
-            vanna=vanna,
-            charm=charm
-        )
-    else:
-        # Fall back to Black-Scholes calculation with validated IV
-        if contract.implied_volatility is None:
-            if log_skipped:
-                print(f"DEBUG: Skipping contract {contract.symbol}@{contract.strike} - missing IV, using 0.20 default")
-            sigma = 0.20
-        elif not (0 < contract.implied_volatility < 5.0):
-            if log_skipped:
-                print(f"DEBUG: Invalid IV {contract.implied_volatility} for {contract.symbol}@{contract.strike}, using 0.20 default")
-            sigma = 0.20
-        else:
-            sigma = contract.implied_volatility
-
-        try:
-            greeks = calculate_greeks(
-                S=spot_price,
-                K=contract.strike,
-                T=T,
-                r=risk_free_rate,
-                q=dividend_yield,
-                sigma=sigma,
-                option_type=contract.option_type
-            )
-
-            # Validate Black-Scholes results too
-            greeks.delta = validate_greek(greeks.delta, -5.0, 5.0)
-            greeks.gamma = validate_greek(greeks.gamma, -1.0, 1.0)
-            greeks.vanna = validate_greek(greeks.vanna, -10.0, 10.0)
-            greeks.charm = validate_greek(greeks.charm, -10.0, 10.0)
-
-        except Exception:
-            # If Black-Scholes fails, return safe defaults
-            greeks = Greeks(delta=0.0, gamma=0.0, vanna=0.0, charm=0.0)
-
-    # Calculate exposures using MM sign convention: MM exposure = -OI * greek
-    open_interest = contract.open_interest or 0
-
-    # Calculate exposures with overflow protection and validation
-    def calculate_safe_exposure(greek_value, multiplier):
-        try:
-            # Validate inputs
-            if not isinstance(open_interest, (int, float)) or not isinstance(greek_value, (int, float)) or not isinstance(multiplier, (int, float)):
-                return 0.0
-
-            if open_interest < 0 or not np.isfinite(open_interest):
-                return 0.0
-
-            if not np.isfinite(greek_value):
-                return 0.0
-
-            if not np.isfinite(multiplier) or multiplier <= 0:
-                return 0.0
-
-            # Calculate with market maker sign convention: MM = -OI
-            raw_value = -open_interest * greek_value * multiplier
-
-            # Validate result
-            if np.isnan(raw_value) or np.isinf(raw_value):
-                return 0.0
-
-            return raw_value
-        except (OverflowError, ValueError, TypeError):
-            return 0.0
-
-    # Apply 1% move normalization (0.01 factor) to match industry standards
-    gex = calculate_safe_exposure(greeks.gamma, (spot_price ** 2) * 0.01 * 100)
-    dex = calculate_safe_exposure(greeks.delta, spot_price * 0.01 * 100)
-    vex = calculate_safe_exposure(greeks.vanna, spot_price * 0.01 * 100)
-    cex = calculate_safe_exposure(greeks.charm, spot_price * 0.01 * 100)
-
-    exposures = Exposures(
-        gex=gex,
-        dex=dex,
-        vex=vex,
-        cex=cex
-    )
-
-    return exposures, greeks
+    return (
+        Exposures(**{key: float(values[0]) for key, values in exposures.items()}),
+        Greeks(**{key: float(values[0]) for key, values in greeks.items()})
+    )
+
+@dataclass(eq=False)
+class StrikeAgg(Mapping):
+    """
+    Per-strike exposure totals as parallel arrays over the sorted unique strikes.
+    Also reads as a {strike: {"gex": ..., ...}} mapping for dict-style callers.
+    """
+    strikes: np.ndarray
+    gex: np.ndarray
+    dex: np.ndarray
+    vex: np.ndarray
+    cex: np.ndarray
+    call_oi: np.ndarray
+    put_oi: np.ndarray
+    contracts: Optional[List[List[Dict]]] = None
+
+    def _row(self, i: int) -> Dict:
+        row = {
+            "gex": float(self.gex[i]),
+            "dex": float(self.dex[i]),
+            "vex": float(self.vex[i]),
+            "cex": float(self.cex[i]),
+            "call_oi": int(self.call_oi[i]),
+            "put_oi": int(self.put_oi[i])
+        }
+        if self.contracts is not None:
+            row["contracts"] = self.contracts[i]
+        return row
+
+    def __getitem__(self, strike: float) -> Dict:
+        i = int(np.searchsorted(self.strikes, strike))
+        if i >= self.strikes.size or self.strikes[i] != strike:
+            raise KeyError(strike)
+        return self._row(i)
+
+    def __iter__(self):
+        return iter(self.strikes.tolist())
+
+    def __len__(self) -> int:
+        return int(self.strikes.size)
+
+    def items(self) -> "_StrikeAggItems":
+        return _StrikeAggItems(self)
+
+    def values(self) -> "_StrikeAggValues":
+        return _StrikeAggValues(self)
+
+    def to_dict(self) -> Dict[float, Dict]:
+        return dict(self.items())
+
+class _StrikeAggItems(ItemsView):
+    # Walks the arrays in order instead of a searchsorted lookup per key
+    def __iter__(self):
+        agg = self._mapping
+        for i, strike in enumerate(agg.strikes.tolist()):
+            yield strike, agg._row(i)
+
+class _StrikeAggValues(ValuesView):
+    def __iter__(self):
+        agg = self._mapping
+        for i in range(len(agg)):
+            yield agg._row(i)
+
+def _group_by_strike(
+    contracts: Optional[List[OptionContract]],
+    strikes: np.ndarray,
+    is_call: np.ndarray,
+    open_interest: np.ndarray,
+    greeks: Dict[str, np.ndarray],
+    exposures: Dict[str, np.ndarray]
+) -> StrikeAgg:
+    """Per-strike totals; contracts (row-aligned with the arrays) adds per-contract detail"""
+    # Sum contract rows per unique strike with np.unique + np.bincount
+    uniq, inv = np.unique(strikes, return_inverse=True)
+    size = uniq.size
+    sums = {
+        key: np.bincount(inv, weights=exposures[key], minlength=size)
+        for key in ("gex", "dex", "vex", "cex")
+    }
+    call_oi = np.bincount(inv, weights=np.where(is_call, open_interest, 0.0), minlength=size)
+    put_oi = np.bincount(inv, weights=np.where(is_call, 0.0, open_interest), minlength=size)
+
+    per_strike_contracts = None
+    if contracts is not None:
+        per_strike_contracts = [[] for _ in range(size)]
+        for i, contract in enumerate(contracts):
+            per_strike_contracts[inv[i]].append({
+                "contract": contract,
+                "exposures": Exposures(**{key: float(exposures[key][i]) for key in exposures}),
+                "greeks": Greeks(**{key: float(greeks[key][i]) for key in greeks})
+            })
+
+    return StrikeAgg(
+        strikes=uniq,
+        gex=sums["gex"],
+        dex=sums["dex"],
+        vex=sums["vex"],
+        cex=sums["cex"],
+        call_oi=call_oi.astype(np.int64),
+        put_oi=put_oi.astype(np.int64),
+        contracts=per_strike_contracts
+    )
 
 def aggregate_by_strike(
     contracts: List[OptionContract],
     spot_price: float,
     risk_free_rate: float,
-    dividend_yield: float
-) -> Dict[float, Dict]:
-
-    print(f"🔍 aggregate_by_strike called with {len(contracts)} contracts")
-    strike_data = defaultdict(lambda: {
-        "gex": 0.0, "dex": 0.0, "vex": 0.0, "cex": 0.0,
-        "call_oi": 0, "put_oi": 0,
-        "contracts": []
-    })
-
-    for contract in contracts:
-        exposures, greeks = calculate_contract_exposures(
-            contract, spot_price, risk_free_rate, dividend_yield
-        )
-
-        strike = contract.strike
-        strike_data[strike]["gex"] += exposures.gex
-        strike_data[strike]["dex"] += exposures.dex
-        strike_data[strike]["vex"] += exposures.vex
-        strike_data[strike]["cex"] += exposures.cex
+    dividend_yield: float,
+    include_contracts: bool = False
+) -> StrikeAgg:
 
-        if contract.option_type.lower() == "call":
-            strike_data[strike]["call_oi"] += contract.open_interest or 0
-        else:
-            strike_data[strike]["put_oi"] += contract.open_interest or 0
+    logger.debug("aggregate_by_strike called with %d contracts", len(contracts))
+    columns = _contract_columns(contracts)
 
-        strike_data[strike]["contracts"].append({
-            "contract": contract,
-            "exposures": exposures,
-            "greeks": greeks
-        })
+    greeks, exposures = _batch_exposures(
+        contracts, columns, spot_price, risk_free_rate, dividend_yield,
+        exposure_multipliers(spot_price)
+    )
 
-    return dict(strike_data)
+    return _group_by_strike(
+        contracts if include_contracts else None,
+        columns["strike"], columns["is_call"], columns["open_interest"], greeks, exposures
+    )
 
 
 def aggregate_by_strike_with_logging(
     contracts: List[OptionContract],
     spot_price: float,
     risk_free_rate: float = 0.045,
-    dividend_yield: float = 0.0
-) -> Dict[float, Dict]:
+    dividend_yield: float = 0.0,
+    include_contracts: bool = False
+) -> StrikeAgg:
     """
     Aggregate exposures by strike with logging for skipped contracts.
     Returns aggregated data and logs count of skipped contracts.
     """
-    skipped_count = 0
-    processed_count = 0
-
-    strike_data = defaultdict(lambda: {
-        "gex": 0.0, "dex": 0.0, "vex": 0.0, "cex": 0.0,
-        "call_oi": 0, "put_oi": 0,
-        "contracts": []
-    })
-
-    for contract in contracts:
-        try:
-            exposures, greeks = calculate_contract_exposures(
-                contract, spot_price, risk_free_rate, dividend_yield, log_skipped=False
-            )
-
-            # Check if contract was effectively skipped (all exposures are 0)
-            if (abs(exposures.gex) < 1e-10 and abs(exposures.dex) < 1e-10 and
-                abs(exposures.vex) < 1e-10 and abs(exposures.cex) < 1e-10):
-                skipped_count += 1
-                continue
-
-            processed_count += 1
-
-        except Exception as e:
-            print(f"ERROR: Failed to calculate exposures for contract {contract.symbol}@{contract.strike}: {e}")
-            skipped_count += 1
-            continue
-
-        strike = contract.strike
-        strike_data[strike]["gex"] += exposures.gex
-        strike_data[strike]["dex"] += exposures.dex
-        strike_data[strike]["vex"] += exposures.vex
-        strike_data[strike]["cex"] += exposures.cex
-
-        if contract.option_type.lower() == "call":
-            strike_data[strike]["call_oi"] += contract.open_interest or 0
-        else:
-            strike_data[strike]["put_oi"] += contract.open_interest or 0
-
-        strike_data[strike]["contracts"].append({
-            "contract": contract,
-            "exposures": exposures,
-            "greeks": greeks
-        })
+    columns = _contract_columns(contracts)
 
+    greeks, exposures = _batch_exposures(
+        contracts, columns, spot_price, risk_free_rate, dividend_yield,
+        exposure_multipliers(spot_price), log_skipped=False
+    )
+
+    # Contracts are effectively skipped when all exposures are 0
+    keep = np.zeros(len(contracts), dtype=bool)
+    for values in exposures.values():
+        keep |= np.abs(values) >= 1e-10
+
+    processed_count = int(keep.sum())
     total_contracts = len(contracts)
-    print(f"DEBUG: Processed {processed_count}/{total_contracts} contracts, skipped {skipped_count}")
+    skipped_count = total_contracts - processed_count
+    logger.debug("Processed %d/%d contracts, skipped %d", processed_count, total_contracts, skipped_count)
+
+    kept_contracts = [c for c, k in zip(contracts, keep) if k] if include_contracts else None
+    return _group_by_strike(
+        kept_contracts,
+        columns["strike"][keep],
+        columns["is_call"][keep],
+        columns["open_interest"][keep],
+        {key: values[keep] for key, values in greeks.items()},
+        {key: values[keep] for key, values in exposures.items()}
+    )
 
-    return dict(strike_data)
+def merge_strike_aggs(strike_aggs: List[StrikeAgg]) -> StrikeAgg:
+    """Sum per-expiration StrikeAggs into one over the union of their strikes"""
+    if not strike_aggs:
+        empty = np.zeros(0, dtype=np.float64)
+        return StrikeAgg(
+            strikes=empty, gex=empty, dex=empty, vex=empty, cex=empty,
+            call_oi=empty.astype(np.int64), put_oi=empty.astype(np.int64)
+        )
+
+    # Same np.unique + np.bincount reduction as _group_by_strike, over the
+    # concatenated per-expiration rows
+    uniq, inv = np.unique(
+        np.concatenate([agg.strikes for agg in strike_aggs]), return_inverse=True
+    )
+    size = uniq.size
+    sums = {
+        key: np.bincount(
+            inv, weights=np.concatenate([getattr(agg, key) for agg in strike_aggs]), minlength=size
+        )
+        for key in ("gex", "dex", "vex", "cex", "call_oi", "put_oi")
+    }
+
+    return StrikeAgg(
+        strikes=uniq,
+        gex=sums["gex"],
+        dex=sums["dex"],
+        vex=sums["vex"],
+        cex=sums["cex"],
+        call_oi=sums["call_oi"].astype(np.int64),
+        put_oi=sums["put_oi"].astype(np.int64)
+    )
 
 def aggregate_all_expirations(
-    strike_aggregations: Dict[float, Dict]
+    strike_aggregations: Union[StrikeAgg, Dict[float, Dict]]
 ) -> Dict:
 
-    total = {"gex": 0.0, "dex": 0.0, "vex": 0.0, "cex": 0.0}
-
-    for strike_data in strike_aggregations.values():
-        total["gex"] += strike_data["gex"]
-        total["dex"] += strike_data["dex"]
-        total["vex"] += strike_data["vex"]
-        total["cex"] += strike_data["cex"]
-
-    return total
+    if isinstance(strike_aggregations, StrikeAgg):
+        return {
+            "gex": float(strike_aggregations.gex.sum()),
+            "dex": float(strike_aggregations.dex.sum()),
+            "vex": float(strike_aggregations.vex.sum()),
+            "cex": float(strike_aggregations.cex.sum())
+        }
+
+    # Legacy dict shape - still reduce in C
+    rows = strike_aggregations.values()
+    return {
+        key: float(np.fromiter((d[key] for d in rows), dtype=np.float64, count=len(rows)).sum())
+        for key in ("gex", "dex", "vex", "cex")
+    }
 
 def calculate_neutral_threshold(values: List[float], epsilon: float = 0.05) -> float:
 
-    if not values:
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.size == 0:
         return epsilon
 
-    abs_values = [abs(v) for v in values]
-    median_abs = np.median(abs_values)
-    return max(epsilon, 0.05 * median_abs)
+    return max(epsilon, 0.05 * float(np.median(np.abs(arr))))
 
 def classify_regime(value: float, neutral_threshold: float) -> str:
 
-    if abs(value) < neutral_threshold:
+    if abs(value) <= neutral_threshold:
         return "o"
-    return "+" if value > 0 else "-"
\ No newline at end of file
+    return "+" if value > 0 else "-"
+
+def classify_regime_vec(values: np.ndarray, neutral_threshold: float) -> np.ndarray:
+    """classify_regime over a whole array, returning a '+'/'-'/'o' array"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.select(
+        [np.abs(values) <= neutral_threshold, values > 0],
+        ["o", "+"],
+        default="-"
+    )
@@ -1,7 +1,66 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import math
 import numpy as np
-from scipy.stats import norm
+from numba import njit
+from scipy.special import ndtr
 from backend.models import Greeks
 
+# 1 / sqrt(2 * pi), normal PDF constant, and 1 / sqrt(2) for the erf-based CDF
+_INV_SQRT_2PI = 0.3989422804014327
+_INV_SQRT_2 = 0.7071067811865476
+
+# Contraction and approximate functions only: full fastmath lets LLVM assume
+# no NaNs, which would make the edge-case guard unreliable for NaN inputs
+_FASTMATH = {"contract", "afn"}
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _norm_cdf(x: float) -> float:
+    # erfc keeps precision in the lower tail where 1 + erf(x) cancels
+    return 0.5 * math.erfc(-x * _INV_SQRT_2)
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _bs_kernel(
+    S: float, K: float, T: float, r: float, q: float, sigma: float, is_call: bool
+) -> Tuple[float, float, float, float]:
+    """Compiled Black-Scholes (delta, gamma, vanna, charm) for one contract."""
+
+    # Handle edge cases, written so NaN inputs also take this branch
+    if not (T > 0 and sigma > 0 and S > 0 and K > 0):
+        return 0.0, 0.0, 0.0, 0.0
+
+    # Calculate d1 and d2 (Black-Scholes parameters)
+    sqrt_T = math.sqrt(T)
+    exp_qT = math.exp(-q * T)
+    sig_sqrt_T = sigma * sqrt_T
+    d1 = (math.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / sig_sqrt_T
+    d2 = d1 - sig_sqrt_T
+
+    # Calculate n(d1)
+    n_d1 = math.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+
+    # Gamma is identical for calls and puts
+    gamma = exp_qT * n_d1 / (S * sig_sqrt_T)
+
+    # Charm: dDelta/dt, simplified version (per year), identical for calls and puts
+    charm = -exp_qT * n_d1 * (
+        q + (r - q) * d1 / sig_sqrt_T - d2 * sigma / (2 * sqrt_T)
+    )
+
+    if is_call:
+        # Call delta; vanna: dDelta/dSigma = d/dSigma[exp(-qT)N(d1)]
+        delta = exp_qT * _norm_cdf(d1)
+        vanna = exp_qT * n_d1 * sqrt_T
+    else:
+        # Put delta and vanna
+        delta = -exp_qT * _norm_cdf(-d1)
+        vanna = -exp_qT * n_d1 * sqrt_T
+
+    return delta, gamma, vanna, charm
+
+_IS_CALL = {"call": True, "put": False}
+
 def calculate_greeks(
     S: float,      # Spot price
     K: float,      # Strike price
@@ -12,65 +71,97 @@ def calculate_greeks(
     option_type: str  # "call" or "put"
 ) -> Greeks:
 
-    # Handle edge cases
-    if T <= 0 or sigma <= 0 or S <= 0 or K <= 0:
-        return Greeks(delta=0.0, gamma=0.0, vanna=0.0, charm=0.0)
+    # OptionContract already lowercases option_type; only fall back to .lower() on a miss
+    is_call = _IS_CALL.get(option_type)
+    if is_call is None:
+        is_call = _IS_CALL.get(option_type.lower())
+        if is_call is None:
+            raise ValueError("option_type must be 'call' or 'put'")
+
+    delta, gamma, vanna, charm = _bs_kernel(
+        float(S), float(K), float(T), float(r), float(q), float(sigma), is_call
+    )
+
+    return Greeks(
+        delta=delta,
+        gamma=gamma,
+        vanna=vanna,
+        charm=charm
+    )
+
+def calculate_greeks_vec(
+    S: float,            # Spot price
+    K: np.ndarray,       # Strike prices
+    T: np.ndarray,       # Times to expiration in years
+    r: float,            # Risk-free rate
+    q: float,            # Dividend yield
+    sigma: np.ndarray,   # Implied volatilities (decimal)
+    is_call: np.ndarray  # True for calls, False for puts
+) -> Dict[str, np.ndarray]:
+    """
+    Batched Black-Scholes Greeks over 1-D arrays of contracts.
+    Matches calculate_greeks element-wise to float32 precision; invalid rows
+    (T, sigma, S or K <= 0) are zero. Returns float32 arrays.
+    """
+    # float32 halves memory traffic through exp/log/ndtr; display-grade
+    # exposures do not need double precision here
+    K = np.asarray(K, dtype=np.float32)
+    T = np.asarray(T, dtype=np.float32)
+    sigma = np.asarray(sigma, dtype=np.float32)
+    is_call = np.asarray(is_call, dtype=bool)
+
+    # Handle edge cases - substitute safe inputs and zero the rows afterwards
+    valid = (T > 0) & (sigma > 0) & (K > 0) & (S > 0)
+    T = np.where(valid, T, 1.0)
+    sigma = np.where(valid, sigma, 1.0)
+    K = np.where(valid, K, 1.0)
+    S_safe = S if S > 0 else 1.0
 
     # Calculate d1 and d2 (Black-Scholes parameters)
-    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-
-    # Calculate N(d1), N(d2), n(d1), n(d2)
-    N_d1 = norm.cdf(d1)
-    N_d2 = norm.cdf(d2)
-    n_d1 = norm.pdf(d1)
-
-    # Calculate Greeks based on option type
-    if option_type.lower() == "call":
-        # Call option Greeks
-        delta = np.exp(-q * T) * N_d1
-        gamma = np.exp(-q * T) * n_d1 / (S * sigma * np.sqrt(T))
-
-        # Vanna: dDelta/dSigma = d/dSigma[exp(-qT)N(d1)]
-        vanna = np.exp(-q * T) * n_d1 * np.sqrt(T)
-
-        # Charm: dDelta/dt = d/dt[exp(-qT)N(d1)]
-        # Simplified version (per year)
-        charm = -np.exp(-q * T) * n_d1 * (
-            q + (r - q) * d1 / (sigma * np.sqrt(T)) - d2 * sigma / (2 * np.sqrt(T))
-        )
-
-    elif option_type.lower() == "put":
-        # Put option Greeks
-        delta = -np.exp(-q * T) * norm.cdf(-d1)
-        gamma = np.exp(-q * T) * n_d1 / (S * sigma * np.sqrt(T))
-
-        # Vanna for put
-        vanna = -np.exp(-q * T) * n_d1 * np.sqrt(T)
-
-        # Charm for put
-        charm = -np.exp(-q * T) * n_d1 * (
-            q + (r - q) * d1 / (sigma * np.sqrt(T)) - d2 * sigma / (2 * np.sqrt(T))
-        )
+    sqrt_T = np.sqrt(T)
+    sig_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S_safe / K) + (r - q + 0.5 * sigma * sigma) * T) / sig_sqrt_T
+    d2 = d1 - sig_sqrt_T
 
-    else:
-        raise ValueError("option_type must be 'call' or 'put'")
+    # ndtr is the C-level normal CDF; the PDF is written out directly
+    n_d1 = np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI
+    exp_qT = np.exp(-q * T)
 
-    return Greeks(
-        delta=float(delta),
-        gamma=float(gamma),
-        vanna=float(vanna),
-        charm=float(charm)
+    delta = np.where(is_call, exp_qT * ndtr(d1), -exp_qT * ndtr(-d1))
+    gamma = exp_qT * n_d1 / (S_safe * sig_sqrt_T)
+    vanna = np.where(is_call, np.float32(1.0), np.float32(-1.0)) * exp_qT * n_d1 * sqrt_T
+    charm = -exp_qT * n_d1 * (
+        q + (r - q) * d1 / sig_sqrt_T - d2 * sigma / (2 * sqrt_T)
     )
 
-def calculate_time_to_expiration(expiration_date: str) -> float:
+    zero = np.float32(0.0)
+    return {
+        "delta": np.where(valid, delta, zero),
+        "gamma": np.where(valid, gamma, zero),
+        "vanna": np.where(valid, vanna, zero),
+        "charm": np.where(valid, charm, zero)
+    }
+
+def calculate_T_batch(expirations: np.ndarray, now: np.datetime64) -> np.ndarray:
+    """
+    Times to expiration in years for a datetime64 array of expiration dates.
+    NaT entries (unparseable dates) return 0.0 like calculate_time_to_expiration.
+    """
+    seconds = (expirations.astype("datetime64[s]") - now.astype("datetime64[s]")).astype("int64")
+    T = np.maximum(0.0, seconds / (365.25 * 24 * 3600))  # Convert to years
+    return np.where(np.isnat(expirations), 0.0, T)
+
+@lru_cache(maxsize=256)
+def _parse_expiry(expiration_date: str) -> datetime:
+    # A chain shares a handful of expiration dates across thousands of contracts
+    return datetime.strptime(expiration_date, "%Y-%m-%d")
+
+def calculate_time_to_expiration(expiration_date: str, now: Optional[datetime] = None) -> float:
     try:
-        exp_date = datetime.strptime(expiration_date, "%Y-%m-%d")
-        now = datetime.now()
+        exp_date = _parse_expiry(expiration_date)
+        if now is None:
+            now = datetime.now()
         time_diff = exp_date - now
-        return max(0, time_diff.total_seconds() / (365.25 * 24 * 3600))  # Convert to years
+        return max(0.0, time_diff.total_seconds() / (365.25 * 24 * 3600))  # Convert to years
     except ValueError:
         return 0.0
-
-# Import here to avoid circular imports
-from datetime import datetime
\ No newline at end of file
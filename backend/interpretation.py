@@ -1,7 +1,7 @@
 from typing import Dict, List, Tuple, Optional
 import numpy as np
 from backend.models import Regime, AggregateData
-from backend.exposures import calculate_neutral_threshold, classify_regime
+from backend.exposures import calculate_neutral_threshold, classify_regime, classify_regime_vec
 
 def classify_exposure_regime(
     gex: float, dex: float, vex: float, cex: float,
@@ -22,6 +22,25 @@ def classify_exposure_regime(
 
     return regime, regime_code
 
+def classify_exposure_regimes(
+    gex: np.ndarray, dex: np.ndarray, vex: np.ndarray, cex: np.ndarray,
+    neutral_threshold: float
+) -> List[Tuple[Regime, str]]:
+    """Regime and regime code for every strike against one shared threshold"""
+
+    # (4, N_strikes) sign array, one row per Greek
+    signs = np.stack([
+        classify_regime_vec(values, neutral_threshold)
+        for values in (gex, dex, vex, cex)
+    ])
+
+    results = []
+    for g, d, v, c in signs.T.tolist():
+        regime = Regime(g=g, d=d, v=v, c=c)
+        results.append((regime, f"G{g} D{d} V{v} C{c}"))
+
+    return results
+
 def determine_conductivity(
     regime: Regime,
     vix_regime: str = "AUTO"
@@ -70,6 +89,27 @@ def determine_conductivity(
     # Default mixed/chop case
     return "MIXED_CHOP", "No clear directional alignment across exposures. Expect range-bound or choppy conditions."
 
+# Terrain mapping based on regime codes
+_TERRAIN_MAP = {
+    "G+ D+ V+ C-": "CEILING/MAGNET — Extreme compression + directional buying support. Pin behavior expected.",
+    "G- D- V- C+": "ACCELERATION ZONE (DOWN) — All directional Greeks aligned bearish. No support structure.",
+    "G- D- V+ C-": "HIGH-VELOCITY DOWN — Momentum amplified, but VEX provides vol-spike cushion. Trapped longs above.",
+    "G+ D+ V- C+": "BOUNCE CANDIDATE — Compression + buying pressure + vol-spike cushion. Reversal setup zone.",
+    "G- D- V+ C-": "CONDITIONAL VOID — Accelerates down, BUT vol spike triggers MM buying (V+ override).",
+    "G+ D+ V- C+": "STRUCTURAL SUPPORT — Strong compression + aggressive MM buying. High-probability floor.",
+}
+_NEUTRAL_TERRAIN = "NEUTRAL — No significant terrain features identified."
+
+# Positional context suffixes: at-the-money, OTM call, OTM put
+_POSITION_SUFFIXES = (" (AT-THE-MONEY)", " (OUT-OF-THE-MONEY CALL)", " (OUT-OF-THE-MONEY PUT)")
+
+def _with_suffixes(label: str) -> Tuple[str, str, str]:
+    return tuple(label + suffix for suffix in _POSITION_SUFFIXES)
+
+# Full classification strings, precomputed per regime code and position
+_TERRAIN_CLASSIFICATIONS = {code: _with_suffixes(label) for code, label in _TERRAIN_MAP.items()}
+_NEUTRAL_CLASSIFICATIONS = _with_suffixes(_NEUTRAL_TERRAIN)
+
 def classify_strike_terrain(
     regime_code: str,
     spot_price: float,
@@ -82,26 +122,16 @@ def classify_strike_terrain(
     if regime_code == "G- D- V- C+":
         pattern_flags.append("MAX_DOWNSIDE_ACCELERATION")
 
-    # Terrain mapping based on regime codes
-    terrain_map = {
-        "G+ D+ V+ C-": "CEILING/MAGNET — Extreme compression + directional buying support. Pin behavior expected.",
-        "G- D- V- C+": "ACCELERATION ZONE (DOWN) — All directional Greeks aligned bearish. No support structure.",
-        "G- D- V+ C-": "HIGH-VELOCITY DOWN — Momentum amplified, but VEX provides vol-spike cushion. Trapped longs above.",
-        "G+ D+ V- C+": "BOUNCE CANDIDATE — Compression + buying pressure + vol-spike cushion. Reversal setup zone.",
-        "G- D- V+ C-": "CONDITIONAL VOID — Accelerates down, BUT vol spike triggers MM buying (V+ override).",
-        "G+ D+ V- C+": "STRUCTURAL SUPPORT — Strong compression + aggressive MM buying. High-probability floor.",
-    }
-
-    classification = terrain_map.get(regime_code, "NEUTRAL — No significant terrain features identified.")
+    classifications = _TERRAIN_CLASSIFICATIONS.get(regime_code, _NEUTRAL_CLASSIFICATIONS)
 
     # Add positional context
     distance_from_spot = abs(strike - spot_price) / spot_price
     if distance_from_spot < 0.01:  # Within 1% of spot
-        classification += " (AT-THE-MONEY)"
+        classification = classifications[0]
     elif strike > spot_price:
-        classification += " (OUT-OF-THE-MONEY CALL)"
+        classification = classifications[1]
     else:
-        classification += " (OUT-OF-THE-MONEY PUT)"
+        classification = classifications[2]
 
     return classification, pattern_flags
 
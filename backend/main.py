@@ -1,28 +1,62 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, List, NamedTuple, Optional, Tuple
 import asyncio
-from cachetools import TTLCache
+import hashlib
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import msgpack
+import numpy as np
+import orjson
+from async_lru import alru_cache
+from pydantic import TypeAdapter, ValidationError
 
 from backend.config import settings
 from backend.tradier_client import TradierClient
 from backend.models import (
     HealthResponse, SpotResponse, ConfigResponse,
-    ExposuresResponse, ExposuresMatrixResponse, StrikeData, OptionContract,
-    StrikeMatrixDetail
+    ExposuresResponse, ExposuresMatrixResponse, OptionContract
+)
+from backend.exposures import (
+    StrikeAgg, aggregate_by_strike_with_logging, aggregate_all_expirations,
+    calculate_neutral_threshold, merge_strike_aggs
 )
-from backend.exposures import aggregate_by_strike_with_logging, aggregate_all_expirations
 from backend.interpretation import (
-    classify_exposure_regime, determine_conductivity,
+    classify_exposure_regimes, determine_conductivity,
     classify_strike_terrain, analyze_vix_regime, generate_aggregate_notes
 )
 
+logger = logging.getLogger(__name__)
+
+# Records from the backend package are queued on the event loop and written
+# out by a background thread, so log I/O never blocks a request
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_backend_logger = logging.getLogger("backend")
+_backend_logger.addHandler(QueueHandler(_log_queue))
+_backend_logger.propagate = False
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _log_listener.start()
+    try:
+        yield
+    finally:
+        await tradier_client.aclose()
+        _log_listener.stop()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="SPX Market Maker Greeks API",
     description="Real-time SPX options exposures and regime analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -34,13 +68,84 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize clients and caches
+# Initialize clients
 tradier_client = TradierClient()
 
-# TTL caches for API responses
-spot_cache = TTLCache(maxsize=1, ttl=settings.cache_ttl_seconds)
-expirations_cache = TTLCache(maxsize=1, ttl=settings.cache_ttl_seconds)
-chain_cache = TTLCache(maxsize=10, ttl=settings.cache_ttl_seconds)  # Cache chains by expiration
+# Validates a whole chain of contract rows in one pydantic-core call
+option_contracts_adapter = TypeAdapter(List[OptionContract])
+
+# TTL caches for Tradier data: concurrent misses on one key share a single
+# in-flight request, and failures are not cached
+@alru_cache(maxsize=1, ttl=settings.cache_ttl_seconds)
+async def _cached_spot() -> SpotResponse:
+    spot_data = await tradier_client.get_spx_quote()
+    return SpotResponse(**spot_data)
+
+@alru_cache(maxsize=1, ttl=settings.expirations_cache_ttl_seconds)
+async def _cached_expirations() -> List[str]:
+    return await tradier_client.get_spx_expirations()
+
+# Bound concurrent per-expiration fetches to stay under Tradier's per-host limits
+fetch_semaphore = asyncio.BoundedSemaphore(8)
+
+async def _bounded(coro):
+    async with fetch_semaphore:
+        return await coro
+
+class CachedBody(NamedTuple):
+    """A serialized response body and the cached upstream objects it was built from"""
+    sources: Tuple
+    body: bytes
+    etag: str
+
+# Serialized response bodies by endpoint and query. An entry is reused only
+# while every source is still the identical cached object, so a body is never
+# staler than the spot/expiration/chain caches behind it
+_BODY_CACHE_SIZE = 64
+_body_cache: "OrderedDict[tuple, CachedBody]" = OrderedDict()
+
+def _body_for(key: tuple, sources: Tuple, build: Callable[[], bytes]) -> CachedBody:
+    cached = _body_cache.get(key)
+    if cached is not None and len(cached.sources) == len(sources) and all(
+        old is new for old, new in zip(cached.sources, sources)
+    ):
+        _body_cache.move_to_end(key)
+        return cached
+
+    body = build()
+    cached = CachedBody(sources, body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"')
+    _body_cache[key] = cached
+    _body_cache.move_to_end(key)
+    if len(_body_cache) > _BODY_CACHE_SIZE:
+        _body_cache.popitem(last=False)
+    return cached
+
+def _body_response(
+    request: Request,
+    cached: CachedBody,
+    media_type: str = "application/json",
+    headers: Optional[dict] = None
+) -> Response:
+    headers = {**(headers or {}), "ETag": cached.etag}
+    # If-None-Match uses weak comparison, so a W/ prefix added by a proxy or
+    # client still matches; "*" matches any current body
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if cached.etag in tags or "*" in tags:
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type=media_type, headers=headers)
+
+async def _spot() -> SpotResponse:
+    try:
+        return await _cached_spot()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch SPX quote: {str(e)}")
+
+async def _expirations() -> List[str]:
+    try:
+        return await _cached_expirations()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch expirations: {str(e)}")
 
 @app.get("/api/health", response_model=HealthResponse)
 async def health_check():
@@ -61,38 +166,24 @@ async def get_config():
     )
 
 @app.get("/api/spot", response_model=SpotResponse)
-async def get_spot():
+async def get_spot(request: Request):
     """Get current SPX spot quote"""
-    cache_key = "spot"
-
-    if cache_key in spot_cache:
-        return spot_cache[cache_key]
-
-    try:
-        spot_data = await tradier_client.get_spx_quote()
-        response = SpotResponse(**spot_data)
-        spot_cache[cache_key] = response
-        return response
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch SPX quote: {str(e)}")
+    spot = await _spot()
+    cached = _body_for(("spot",), (spot,), lambda: spot.model_dump_json().encode())
+    return _body_response(request, cached)
 
 @app.get("/api/expirations")
-async def get_expirations():
+async def get_expirations(request: Request):
     """Get available SPX options expiration dates"""
-    cache_key = "expirations"
-
-    if cache_key in expirations_cache:
-        return {"expirations": expirations_cache[cache_key]}
-
-    try:
-        expirations = await tradier_client.get_spx_expirations()
-        expirations_cache[cache_key] = expirations
-        return {"expirations": expirations}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch expirations: {str(e)}")
+    expirations = await _expirations()
+    cached = _body_for(
+        ("expirations",), (expirations,), lambda: orjson.dumps({"expirations": expirations})
+    )
+    return _body_response(request, cached)
 
 @app.get("/api/exposures", response_model=ExposuresResponse)
 async def get_exposures(
+    request: Request,
     expiration: str = Query(..., description="Expiration date (YYYY-MM-DD) or 'ALL'"),
     vix_regime: str = Query("AUTO", description="VIX regime: RISING, FALLING, AUTO")
 ):
@@ -112,148 +203,170 @@ async def get_exposures(
         vix_warning = "AUTO regime used without VIX data available - defaulting to FALLING"
 
     try:
-        # Get spot price
-        spot_response = await get_spot()
-        spot_price = spot_response.last
-
         # Get data based on expiration
         if expiration == "ALL":
-            # Get all expirations
-            exp_response = await get_expirations()
-            all_expirations = exp_response["expirations"]
-
-            # Aggregate data across all expirations
-            all_strike_data = {}
-            for exp_date in all_expirations[:5]:  # Limit to first 5 expirations for performance
-                try:
-                    chain_data = await get_chain_data(exp_date, spot_price)
-                    exp_strikes = aggregate_by_strike_with_logging(
-                        chain_data,
-                        spot_price,
-                        settings.risk_free_rate,
-                        settings.dividend_yield
-                    )
-
-                    # Merge with existing data
-                    for strike, data in exp_strikes.items():
-                        if strike not in all_strike_data:
-                            all_strike_data[strike] = data.copy()
-                        else:
-                            # Aggregate across expirations
-                            for key in ["gex", "dex", "vex", "cex"]:
-                                all_strike_data[strike][key] += data[key]
-                            all_strike_data[strike]["call_oi"] += data["call_oi"]
-                            all_strike_data[strike]["put_oi"] += data["put_oi"]
-
-                except Exception as e:
-                    continue  # Skip failed expirations
-
-            strike_aggregations = all_strike_data
-        else:
-            # Single expiration
-            chain_data = await get_chain_data(expiration, spot_price)
-            print(f"🔍 Chain data for {expiration}: {len(chain_data)} contracts")
-            strike_aggregations = aggregate_by_strike_with_logging(
-                chain_data,
-                spot_price,
-                settings.risk_free_rate,
-                settings.dividend_yield
+            # Spot and the expiration list are independent; fetch them together
+            spot_response, all_expirations = await asyncio.gather(_spot(), _expirations())
+            spot_price = spot_response.last
+
+            # Fetch chains concurrently; limit to first 5 expirations for performance
+            chains = await asyncio.gather(
+                *(_bounded(get_chain_data(exp_date, spot_price)) for exp_date in all_expirations[:5]),
+                return_exceptions=True
             )
-            print(f"🔍 Strike aggregations for {expiration}: {len(strike_aggregations)} strikes")
-
-        # Convert to StrikeData objects
-        strikes_data = []
-        all_exposure_values = []
-
-
-        for strike, data in strike_aggregations.items():
-            # Collect all exposure values for neutral threshold calculation
-            all_exposure_values.extend([data["gex"], data["dex"], data["vex"], data["cex"]])
+        else:
+            # Single expiration; the chain's strike filter needs the spot first
+            spot_response = await _spot()
+            spot_price = spot_response.last
+            chains = [await get_chain_data(expiration, spot_price)]
+
+        cached = _body_for(
+            ("exposures", expiration, vix_regime), (spot_response, *chains),
+            lambda: ExposuresResponse.model_validate(_exposures_response(
+                expiration, spot_price, chains, vix_regime_used, vix_warning
+            )).model_dump_json().encode()
+        )
+        return _body_response(request, cached)
 
-            # Classify regime
-            regime, regime_code = classify_exposure_regime(
-                data["gex"], data["dex"], data["vex"], data["cex"],
-                all_exposure_values
-            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to calculate exposures for %s", expiration)
+        raise HTTPException(status_code=500, detail=f"Failed to calculate exposures: {str(e)}")
 
-            # Classify terrain
-            classification, pattern_flags = classify_strike_terrain(
-                regime_code, spot_price, strike
-            )
+def _exposures_response(
+    expiration: str,
+    spot_price: float,
+    chains: List,
+    vix_regime_used: str,
+    vix_warning: Optional[str]
+) -> dict:
+    """Build the exposures response from the fetched chains"""
+    if expiration == "ALL":
+        # Aggregate each expiration, then sum them per strike in one pass
+        exp_aggregations = []
+        for chain_data in chains:
+            if isinstance(chain_data, Exception):
+                continue  # Skip failed expirations
+            try:
+                exp_aggregations.append(aggregate_by_strike_with_logging(
+                    chain_data,
+                    spot_price,
+                    settings.risk_free_rate,
+                    settings.dividend_yield
+                ))
+            except Exception as e:
+                continue  # Skip failed expirations
+
+        strike_aggregations = merge_strike_aggs(exp_aggregations)
+    else:
+        chain_data = chains[0]
+        logger.debug("Chain data for %s: %d contracts", expiration, len(chain_data))
+        strike_aggregations = aggregate_by_strike_with_logging(
+            chain_data,
+            spot_price,
+            settings.risk_free_rate,
+            settings.dividend_yield
+        )
+        logger.debug("Strike aggregations for %s: %d strikes", expiration, len(strike_aggregations))
+
+    # One neutral threshold over every strike's exposures, shared by the
+    # per-strike and aggregate regimes; read straight from the StrikeAgg columns
+    neutral_threshold = _neutral_threshold(strike_aggregations)
+    strike_regimes = classify_exposure_regimes(
+        strike_aggregations.gex, strike_aggregations.dex,
+        strike_aggregations.vex, strike_aggregations.cex,
+        neutral_threshold
+    )
 
-            strike_data = StrikeData(
-                strike=strike,
-                gex=data["gex"],
-                dex=data["dex"],
-                vex=data["vex"],
-                cex=data["cex"],
-                regime=regime,
-                regime_code=regime_code,
-                classification=classification,
-                pattern_flags=pattern_flags,
-                call_oi=data["call_oi"],
-                put_oi=data["put_oi"],
-                meta={
-                    "iv_call": 0.0,  # Would be populated from contract data
-                    "iv_put": 0.0,   # Would be populated from contract data
-                    "t_years": 0.0,  # Would be populated from contract data
-                    "r": settings.risk_free_rate,
-                    "q": settings.dividend_yield
-                }
-            )
-            strikes_data.append(strike_data)
-
-        # Calculate aggregate data from strike_aggregations
-        if len(strikes_data) > 0:
-            aggregate_exposures = aggregate_all_expirations(strike_aggregations)
-            agg_regime, agg_regime_code = classify_exposure_regime(
-                aggregate_exposures["gex"], aggregate_exposures["dex"],
-                aggregate_exposures["vex"], aggregate_exposures["cex"],
-                all_exposure_values
-            )
+    # Plain dicts per strike; ExposuresResponse validates them all in one
+    # pass at the edge instead of building a StrikeData model per strike
+    strikes_data = []
+
+    # Identical for every strike; validation copies it into each StrikeData
+    meta = {
+        "iv_call": 0.0,  # Would be populated from contract data
+        "iv_put": 0.0,   # Would be populated from contract data
+        "t_years": 0.0,  # Would be populated from contract data
+        "r": settings.risk_free_rate,
+        "q": settings.dividend_yield
+    }
 
-            conductivity, notes = determine_conductivity(agg_regime, vix_regime_used)
-
-            aggregate_data = {
-                "gex": aggregate_exposures["gex"],
-                "dex": aggregate_exposures["dex"],
-                "vex": aggregate_exposures["vex"],
-                "cex": aggregate_exposures["cex"],
-                "regime": agg_regime,
-                "regime_code": agg_regime_code,
-                "conductivity": conductivity,
-                "notes": notes
-            }
-        else:
-            # No real market data available
-            raise HTTPException(
-                status_code=503,
-                detail="No options market data available. Unable to calculate Greek exposures."
-            )
+    # Convert each column to Python scalars in one call rather than
+    # indexing a per-strike row dict out of the arrays
+    columns = zip(
+        strike_aggregations.strikes.tolist(),
+        strike_aggregations.gex.tolist(), strike_aggregations.dex.tolist(),
+        strike_aggregations.vex.tolist(), strike_aggregations.cex.tolist(),
+        strike_aggregations.call_oi.tolist(), strike_aggregations.put_oi.tolist(),
+        strike_regimes
+    )
+    for strike, gex, dex, vex, cex, call_oi, put_oi, (regime, regime_code) in columns:
+        # Classify terrain
+        classification, pattern_flags = classify_strike_terrain(
+            regime_code, spot_price, strike
+        )
 
-        response = {
-            "timestamp": datetime.now().isoformat(),
-            "spot": spot_price,
-            "expiration": expiration,
-            "aggregate": aggregate_data,
-            "vix_regime_used": vix_regime_used,
-            "strikes": strikes_data
+        strikes_data.append({
+            "strike": strike,
+            "gex": gex,
+            "dex": dex,
+            "vex": vex,
+            "cex": cex,
+            "regime": regime,
+            "regime_code": regime_code,
+            "classification": classification,
+            "pattern_flags": pattern_flags,
+            "call_oi": call_oi,
+            "put_oi": put_oi,
+            "meta": meta
+        })
+
+    # Calculate aggregate data from strike_aggregations
+    if len(strikes_data) > 0:
+        aggregate_exposures = aggregate_all_expirations(strike_aggregations)
+        agg_regime, agg_regime_code = classify_exposure_regimes(
+            np.array([aggregate_exposures["gex"]]), np.array([aggregate_exposures["dex"]]),
+            np.array([aggregate_exposures["vex"]]), np.array([aggregate_exposures["cex"]]),
+            neutral_threshold
+        )[0]
+
+        conductivity, notes = determine_conductivity(agg_regime, vix_regime_used)
+
+        aggregate_data = {
+            "gex": aggregate_exposures["gex"],
+            "dex": aggregate_exposures["dex"],
+            "vex": aggregate_exposures["vex"],
+            "cex": aggregate_exposures["cex"],
+            "regime": agg_regime,
+            "regime_code": agg_regime_code,
+            "conductivity": conductivity,
+            "notes": notes
         }
+    else:
+        # No real market data available
+        raise HTTPException(
+            status_code=503,
+            detail="No options market data available. Unable to calculate Greek exposures."
+        )
 
-        if vix_warning:
-            response["vix_warning"] = vix_warning
+    response = {
+        "timestamp": datetime.now().isoformat(),
+        "spot": spot_price,
+        "expiration": expiration,
+        "aggregate": aggregate_data,
+        "vix_regime_used": vix_regime_used,
+        "strikes": strikes_data
+    }
 
-        return response
+    if vix_warning:
+        response["vix_warning"] = vix_warning
 
-    except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"EXPOSURES ERROR: {str(e)}")
-        print(f"TRACEBACK: {error_details}")
-        raise HTTPException(status_code=500, detail=f"Failed to calculate exposures: {str(e)}")
+    return response
 
 @app.get("/api/exposures_matrix", response_model=ExposuresMatrixResponse)
 async def get_exposures_matrix(
+    request: Request,
     metric: str = Query(..., description="Metric: GEX, DEX, VEX, CEX"),
     expiration: str = Query("ALL", description="Expiration date or 'ALL'"),
     vix_regime: str = Query("AUTO", description="VIX regime: RISING, FALLING, AUTO")
@@ -280,157 +393,248 @@ async def get_exposures_matrix(
         vix_warning = "AUTO regime used without VIX data available - defaulting to FALLING"
 
     try:
-        # Get spot price
-        spot_response = await get_spot()
+        # Spot and the expiration list are independent; fetch them together
+        spot_response, expirations = await asyncio.gather(_spot(), _expirations())
         spot_price = spot_response.last
+        all_expirations = expirations[:8]  # Limit to 8 expirations for performance
 
-        # Get all available expirations
-        exp_response = await get_expirations()
-        all_expirations = exp_response["expirations"][:8]  # Limit to 8 expirations for performance
-
-        print(f"📊 Building enhanced matrix for {len(all_expirations)} expirations with metric {metric}")
-
-        # Collect data for each expiration
-        expiration_data = {}
-        all_strikes = set()
-        strike_details_map = {}  # Collect detailed strike information
+        # Fetch every expiration's chain concurrently
+        chains = await asyncio.gather(
+            *(_bounded(get_chain_data(exp, spot_price)) for exp in all_expirations),
+            return_exceptions=True
+        )
 
-        for exp in all_expirations:
-            try:
-                # Get exposure data for this specific expiration
-                exp_data = await get_exposures(exp, vix_regime)
-
-                # Store strike -> exposure mapping for this expiration
-                strike_exposures = {}
-                for strike_data in exp_data["strikes"]:
-                    strike = strike_data.strike
-                    exposure_value = getattr(strike_data, metric.lower())
-                    strike_exposures[strike] = exposure_value
-                    all_strikes.add(strike)
-
-                    # Collect detailed strike information (from first expiration that has this strike)
-                    if str(strike) not in strike_details_map:
-                        strike_details_map[str(strike)] = StrikeMatrixDetail(
-                            regime_code=strike_data.regime_code,
-                            classification=strike_data.classification,
-                            pattern_flags=strike_data.pattern_flags,
-                            gex=strike_data.gex,
-                            dex=strike_data.dex,
-                            vex=strike_data.vex,
-                            cex=strike_data.cex,
-                            call_oi=strike_data.call_oi,
-                            put_oi=strike_data.put_oi
-                        )
-
-                expiration_data[exp] = strike_exposures
-                print(f"✅ Loaded {len(strike_exposures)} strikes for {exp}")
+        # Clients that accept MessagePack get z as packed float32 instead of JSON text
+        if MSGPACK_MEDIA_TYPE in request.headers.get("accept", ""):
+            media_type, encode = MSGPACK_MEDIA_TYPE, _matrix_msgpack
+        else:
+            media_type, encode = "application/json", lambda matrix: matrix.model_dump_json().encode()
 
-            except Exception as e:
-                print(f"⚠️ Failed to get data for {exp}: {e}")
-                # Continue with other expirations
-
-        # Create common strike set (sorted)
-        common_strikes = sorted(list(all_strikes))[:25]  # Limit strikes for performance
-        print(f"🎯 Using {len(common_strikes)} common strikes across {len(expiration_data)} expirations")
-
-        # Build matrix: rows = expirations, columns = strikes
-        matrix_data = []
-        for exp in all_expirations:
-            if exp in expiration_data:
-                row = []
-                for strike in common_strikes:
-                    # Get exposure value for this expiration + strike combination
-                    value = expiration_data[exp].get(strike, 0.0)
-                    row.append(value)
-                matrix_data.append(row)
-            else:
-                # Fill with zeros if no data for this expiration
-                matrix_data.append([0.0] * len(common_strikes))
-
-        print(f"📈 Generated {len(matrix_data)}×{len(common_strikes)} matrix with detailed strike info")
-
-        return ExposuresMatrixResponse(
-            timestamp=datetime.now().isoformat(),
-            spot=spot_price,
-            metric=metric,
-            x_expirations=all_expirations,
-            y_strikes=common_strikes,
-            z=matrix_data,
-            strike_details=strike_details_map,
-            vix_regime_used=vix_regime_used,
-            vix_warning=vix_warning
+        cached = _body_for(
+            ("exposures_matrix", metric, vix_regime, media_type), (spot_response, expirations, *chains),
+            lambda: encode(_matrix_response(
+                metric, spot_price, all_expirations, chains, vix_regime_used, vix_warning
+            ))
         )
+        return _body_response(request, cached, media_type, headers={"Vary": "Accept"})
 
+    except HTTPException:
+        raise
     except Exception as e:
+        logger.exception("Failed to generate %s matrix", metric)
         raise HTTPException(status_code=500, detail=f"Failed to generate matrix: {str(e)}")
 
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+def _matrix_msgpack(matrix: ExposuresMatrixResponse) -> bytes:
+    """
+    MessagePack body for the matrix. z is sent as raw little-endian float32
+    bytes with its [expirations, strikes] shape in z_shape; decode it with
+    np.frombuffer(z, "<f4").reshape(z_shape).
+    """
+    payload = matrix.model_dump(exclude={"z"})
+    z = np.asarray(matrix.z, dtype="<f4").reshape(len(matrix.x_expirations), len(matrix.y_strikes))
+    payload["z"] = z.tobytes()
+    payload["z_shape"] = list(z.shape)
+    return msgpack.packb(payload)
+
+def _matrix_response(
+    metric: str,
+    spot_price: float,
+    all_expirations: List[str],
+    chains: List,
+    vix_regime_used: str,
+    vix_warning: Optional[str]
+) -> ExposuresMatrixResponse:
+    """Build the exposures matrix from the fetched chains"""
+    logger.debug("Building enhanced matrix for %d expirations with metric %s", len(all_expirations), metric)
+
+    # Collect data for each expiration
+    metric_key = metric.lower()
+    strike_aggs = {}
+
+    for exp, chain_data in zip(all_expirations, chains):
+        if isinstance(chain_data, Exception):
+            logger.warning("Failed to get data for %s: %s", exp, chain_data)
+            continue  # Continue with other expirations
+        try:
+            agg = aggregate_by_strike_with_logging(
+                chain_data,
+                spot_price,
+                settings.risk_free_rate,
+                settings.dividend_yield
+            )
+        except Exception as e:
+            logger.warning("Failed to get data for %s: %s", exp, e)
+            continue  # Continue with other expirations
+
+        strike_aggs[exp] = agg
+        logger.debug("Loaded %d strikes for %s", len(agg), exp)
+
+    # Create common strike set (sorted)
+    all_strikes = np.unique(np.concatenate([agg.strikes for agg in strike_aggs.values()] or [np.empty(0)]))
+    common = all_strikes[:25]  # Limit strikes for performance
+    common_strikes = common.tolist()
+    logger.debug("Using %d common strikes across %d expirations", len(common_strikes), len(strike_aggs))
+
+    # Classify only the displayed strikes, each from the first expiration
+    # that has it, against that expiration's neutral threshold
+    strike_details_map = {}  # Collect detailed strike information
+    pending = common_strikes
+    for agg in strike_aggs.values():
+        found = [strike for strike in pending if strike in agg]
+        if not found:
+            continue
+        pending = [strike for strike in pending if strike not in agg]
+
+        neutral_threshold = _neutral_threshold(agg)
+        rows = [agg[strike] for strike in found]
+        regimes = classify_exposure_regimes(
+            np.array([row["gex"] for row in rows]), np.array([row["dex"] for row in rows]),
+            np.array([row["vex"] for row in rows]), np.array([row["cex"] for row in rows]),
+            neutral_threshold
+        )
+
+        for strike, row, (_, regime_code) in zip(found, rows, regimes):
+            classification, pattern_flags = classify_strike_terrain(
+                regime_code, spot_price, strike
+            )
+            # Validated into StrikeMatrixDetail with the rest of the response
+            strike_details_map[str(strike)] = {
+                "regime_code": regime_code,
+                "classification": classification,
+                "pattern_flags": pattern_flags,
+                "gex": row["gex"],
+                "dex": row["dex"],
+                "vex": row["vex"],
+                "cex": row["cex"],
+                "call_oi": row["call_oi"],
+                "put_oi": row["put_oi"]
+            }
+
+    # Build matrix: rows = expirations, columns = strikes. Zero where an
+    # expiration has no data or does not list the strike
+    matrix = np.zeros((len(all_expirations), common.size))
+    for i, exp in enumerate(all_expirations):
+        agg = strike_aggs.get(exp)
+        if agg is None:
+            continue
+        # Both strike arrays are sorted, so one searchsorted places every column
+        cols = np.searchsorted(agg.strikes, common)
+        present = cols < agg.strikes.size
+        present[present] = agg.strikes[cols[present]] == common[present]
+        matrix[i, present] = getattr(agg, metric_key)[cols[present]]
+
+    logger.debug("Generated %d×%d matrix with detailed strike info", *matrix.shape)
+
+    return ExposuresMatrixResponse(
+        timestamp=datetime.now().isoformat(),
+        spot=spot_price,
+        metric=metric,
+        x_expirations=all_expirations,
+        y_strikes=common_strikes,
+        z=matrix.tolist(),
+        strike_details=strike_details_map,
+        vix_regime_used=vix_regime_used,
+        vix_warning=vix_warning
+    )
+
+def _neutral_threshold(strike_aggregations: StrikeAgg) -> float:
+    """Neutral threshold over all four exposure columns of one aggregation"""
+    return calculate_neutral_threshold(np.concatenate([
+        strike_aggregations.gex, strike_aggregations.dex,
+        strike_aggregations.vex, strike_aggregations.cex
+    ]))
+
 async def get_chain_data(expiration: str, spot_price: float = None) -> List:
     """Helper function to get cached chain data"""
-    cache_key = f"chain_{expiration}"
+    try:
+        return await _cached_chain(expiration, spot_price)
+    except Exception as e:
+        return []  # Return empty list on error
 
-    if cache_key in chain_cache:
-        return chain_cache[cache_key]
+# Keyed by (expiration, spot) since the strike filter depends on spot; spot
+# itself only changes once per TTL window
+@alru_cache(maxsize=16, ttl=settings.cache_ttl_seconds)
+async def _cached_chain(expiration: str, spot_price: Optional[float]) -> List[OptionContract]:
+    chain_data = await tradier_client.get_spx_chain(expiration)
+    options = chain_data.get("options", [])
 
+    # Parse strikes once; the filter and the contract rows both use them
+    strikes = np.fromiter(
+        (opt.get("strike", 0) for opt in options), dtype=np.float64, count=len(options)
+    )
+
+    # Filter options to strikes within 30% of spot price for performance
+    if spot_price is not None:
+        original_count = len(options)
+        lo, hi = spot_price * 0.7, spot_price * 1.3
+        kept = np.flatnonzero((strikes >= lo) & (strikes <= hi))
+        options = [options[i] for i in kept]
+        strikes = strikes[kept]
+        logger.debug(
+            "Filtered %d options to %d relevant strikes (±30%% of spot: %.0f-%.0f)",
+            original_count, len(options), lo, hi
+        )
+
+        if options:
+            logger.debug("Sample option: %s", options[0])
+
+    # Extract contract fields; Greeks come from the nested structure
+    rows = []
+    for opt, strike in zip(options, strikes.tolist()):
+        try:
+            greeks = opt.get("greeks", {})
+            rows.append({
+                "symbol": opt.get("symbol", ""),
+                "option_type": opt.get("option_type", "call" if "C" in opt.get("symbol", "") else "put"),
+                "strike": strike,
+                "expiration_date": expiration,
+                "bid": float(opt.get("bid", 0) or 0),
+                "ask": float(opt.get("ask", 0) or 0),
+                "last": float(opt.get("last", 0) or 0),
+                "volume": int(opt.get("volume", 0) or 0),
+                "open_interest": int(opt.get("open_interest", 0) or 0),
+                "implied_volatility": greeks.get("mid_iv") or greeks.get("smv_vol"),
+                "delta": greeks.get("delta"),
+                "gamma": greeks.get("gamma"),
+                "theta": greeks.get("theta"),
+                "vega": greeks.get("vega")
+            })
+        except Exception as e:
+            logger.warning("Failed to create contract for %s: %s", opt.get("symbol", "unknown"), e)
+            continue
+
+    # Convert to OptionContract objects in one validation pass; if any row is
+    # invalid, fall back to row by row so only that contract is dropped
     try:
-        chain_data = await tradier_client.get_spx_chain(expiration)
-        options = chain_data.get("options", [])
-
-        # Filter options to strikes within 30% of spot price for performance
-        if spot_price is not None:
-            original_count = len(options)
-            options = [
-                opt for opt in options
-                if spot_price * 0.7 <= float(opt.get("strike", 0)) <= spot_price * 1.3
-            ]
-            print(f"📊 Filtered {original_count} options to {len(options)} relevant strikes (±30% of spot: {spot_price * 0.7:.0f}-{spot_price * 1.3:.0f})")
-
-            # Debug: show first available option
-            if options:
-                print(f"🔍 Sample option: {options[0]}")
-
-        # Convert to OptionContract objects
+        contracts = option_contracts_adapter.validate_python(rows)
+    except ValidationError:
         contracts = []
-        for opt in options:
+        for row in rows:
             try:
-                # Extract Greeks from nested structure
-                greeks = opt.get("greeks", {})
-                contract = OptionContract(
-                    symbol=opt.get("symbol", ""),
-                    option_type=opt.get("option_type", "call" if "C" in opt.get("symbol", "") else "put"),
-                    strike=float(opt.get("strike", 0)),
-                    expiration_date=expiration,
-                    bid=float(opt.get("bid", 0) or 0),
-                    ask=float(opt.get("ask", 0) or 0),
-                    last=float(opt.get("last", 0) or 0),
-                    volume=int(opt.get("volume", 0) or 0),
-                    open_interest=int(opt.get("open_interest", 0) or 0),
-                    implied_volatility=greeks.get("mid_iv") or greeks.get("smv_vol"),
-                    delta=greeks.get("delta"),
-                    gamma=greeks.get("gamma"),
-                    theta=greeks.get("theta"),
-                    vega=greeks.get("vega")
-                )
-                contracts.append(contract)
-            except Exception as e:
-                print(f"❌ Failed to create contract for {opt.get('symbol', 'unknown')}: {e}")
-                continue
+                contracts.append(OptionContract(**row))
+            except ValidationError as e:
+                logger.warning("Failed to create contract for %s: %s", row["symbol"], e)
 
-        print(f"📦 Created {len(contracts)} OptionContract objects from {len(options)} options")
+    logger.debug("Created %d OptionContract objects from %d options", len(contracts), len(options))
 
-        chain_cache[cache_key] = contracts
-        return contracts
+    return contracts
 
-    except Exception as e:
-        return []  # Return empty list on error
+# Settings are fixed after startup, so the debug payload is computed once
+_is_placeholder_token = settings.tradier_token == "placeholder_token"
+_DEBUG_INFO = {
+    "token_loaded": "placeholder_token" if _is_placeholder_token else settings.tradier_token[:10] + "...",
+    "token_length": len(settings.tradier_token),
+    "is_placeholder": _is_placeholder_token
+}
 
 @app.get("/api/debug")
 async def debug_info():
-    """Debug endpoint to check configuration"""
-    return {
-        "token_loaded": settings.tradier_token[:10] + "..." if settings.tradier_token != "placeholder_token" else "placeholder_token",
-        "token_length": len(settings.tradier_token),
-        "is_placeholder": settings.tradier_token == "placeholder_token"
-    }
+    """Debug endpoint to check configuration; only served when settings.debug is on"""
+    if not settings.debug:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return _DEBUG_INFO
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 class OptionContract(BaseModel):
     """Represents a single option contract"""
@@ -20,6 +20,17 @@ class OptionContract(BaseModel):
     vega: Optional[float] = None
     rho: Optional[float] = None
 
+    @field_validator("option_type")
+    @classmethod
+    def _normalize_option_type(cls, value: str) -> str:
+        # Lowercase once at parse time so is_call is a plain comparison
+        return value.lower()
+
+    @property
+    def is_call(self) -> bool:
+        """Derived from option_type, so it cannot disagree with it"""
+        return self.option_type == "call"
+
 class Greeks(BaseModel):
     """Calculated Greeks for an option"""
     delta: float
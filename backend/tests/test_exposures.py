@@ -1,11 +1,18 @@
 import pytest
+import numpy as np
 from backend.exposures import (
     calculate_contract_exposures,
     aggregate_by_strike,
+    aggregate_by_strike_with_logging,
     aggregate_all_expirations,
     calculate_neutral_threshold,
-    classify_regime
+    classify_regime,
+    classify_regime_vec,
+    merge_strike_aggs,
+    StrikeAgg
 )
+from backend.greeks import calculate_greeks, calculate_time_to_expiration
+from backend.interpretation import classify_exposure_regime, classify_exposure_regimes
 from backend.models import OptionContract, Exposures, Greeks
 
 
@@ -86,6 +93,61 @@ class TestContractExposures:
         assert exposures.vex == 0
         assert exposures.cex == 0
 
+    def test_black_scholes_fallback_exposures(self):
+        """Test contracts without broker Greeks are priced and scaled in the compiled kernel"""
+        contract = OptionContract(
+            symbol="SPX991217P04600000",
+            option_type="put",
+            strike=4600,
+            expiration_date="2099-12-17",
+            open_interest=500,
+            implied_volatility=0.25
+        )
+
+        exposures, greeks = calculate_contract_exposures(
+            contract, spot_price=4700, risk_free_rate=0.045, dividend_yield=0.01
+        )
+
+        T = calculate_time_to_expiration("2099-12-17")
+        expected = calculate_greeks(4700, 4600, T, 0.045, 0.01, 0.25, "put")
+        assert greeks.delta == pytest.approx(expected.delta, rel=1e-6)
+        assert greeks.gamma == pytest.approx(expected.gamma, rel=1e-6)
+        assert greeks.vanna == pytest.approx(expected.vanna, rel=1e-6)
+        assert greeks.charm == pytest.approx(expected.charm, rel=1e-6)
+
+        # MM exposure = -OI * greek * multiplier
+        assert exposures.gex == pytest.approx(-500 * 4700**2 * 0.01 * 100 * greeks.gamma)
+        assert exposures.dex == pytest.approx(-500 * 4700 * 0.01 * 100 * greeks.delta)
+
+    def test_is_call_derived_from_option_type(self):
+        """Test is_call is normalized from option_type at parse time"""
+        call = OptionContract(
+            symbol="SPX250317C04700000", option_type="Call", strike=4700,
+            expiration_date="2025-03-17"
+        )
+        put = OptionContract(
+            symbol="SPX250317P04700000", option_type="put", strike=4700,
+            expiration_date="2025-03-17"
+        )
+        assert call.option_type == "call"
+        assert call.is_call is True
+        assert put.is_call is False
+
+    def test_is_call_follows_option_type(self):
+        """Test is_call cannot go stale relative to option_type"""
+        put = OptionContract(
+            symbol="SPX250317P04700000", option_type="put", strike=4700,
+            expiration_date="2025-03-17", is_call=True
+        )
+        assert put.is_call is False
+        assert put.model_copy(update={"option_type": "call"}).is_call is True
+
+        constructed = OptionContract.model_construct(
+            symbol="SPX250317C04700000", option_type="call", strike=4700,
+            expiration_date="2025-03-17"
+        )
+        assert constructed.is_call is True
+
 
 class TestAggregation:
     """Test exposure aggregation functions"""
@@ -130,6 +192,51 @@ class TestAggregation:
         assert strike_data["call_oi"] == 1000
         assert strike_data["put_oi"] == 800
 
+        # Arrays and dict-style access agree
+        assert isinstance(result, StrikeAgg)
+        assert list(result.strikes) == [4700]
+        assert result.gex[0] == strike_data["gex"]
+        assert result.to_dict() == {4700: strike_data}
+        assert list(result.items()) == [(4700, strike_data)]
+        assert len(result.values()) == 1
+        assert aggregate_all_expirations(result)["gex"] == pytest.approx(strike_data["gex"])
+
+    def test_aggregate_skips_zero_exposure_contracts(self):
+        """Test contracts without exposure are left out of the strike totals"""
+        contracts = [
+            OptionContract(
+                symbol="SPX250317C04700000",
+                option_type="call",
+                strike=4700,
+                expiration_date="2025-03-17",
+                open_interest=1000,
+                delta=0.6,
+                gamma=0.02,
+                theta=-10,
+                vega=50
+            ),
+            OptionContract(
+                symbol="SPX250317P04800000",
+                option_type="put",
+                strike=4800,
+                expiration_date="2025-03-17",
+                open_interest=0,
+                delta=-0.4,
+                gamma=0.02,
+                theta=-8,
+                vega=45
+            )
+        ]
+
+        result = aggregate_by_strike_with_logging(
+            contracts, spot_price=4700, risk_free_rate=0.045, dividend_yield=0,
+            include_contracts=True
+        )
+
+        assert 4800 not in result
+        assert result[4700]["call_oi"] == 1000
+        assert len(result[4700]["contracts"]) == 1
+
     def test_aggregate_all_expirations(self):
         """Test total aggregation across expirations"""
         strike_data = {
@@ -144,6 +251,30 @@ class TestAggregation:
         assert result["vex"] == -350   # -200 + -150
         assert result["cex"] == 150    # 100 + 50
 
+    def test_merge_strike_aggs(self):
+        """Test per-expiration aggregations sum over the union of strikes"""
+        def agg(strikes, gex, call_oi):
+            n = len(strikes)
+            return StrikeAgg(
+                strikes=np.array(strikes, dtype=np.float64),
+                gex=np.array(gex, dtype=np.float64),
+                dex=np.ones(n), vex=np.zeros(n), cex=np.zeros(n),
+                call_oi=np.array(call_oi, dtype=np.int64),
+                put_oi=np.zeros(n, dtype=np.int64)
+            )
+
+        merged = merge_strike_aggs([
+            agg([4700, 4750], [-1000, -800], [10, 20]),
+            agg([4650, 4750], [-50, -200], [5, 1])
+        ])
+
+        assert list(merged.strikes) == [4650, 4700, 4750]
+        assert merged[4750]["gex"] == -1000
+        assert merged[4750]["dex"] == 2
+        assert merged[4750]["call_oi"] == 21
+        assert merged[4650]["gex"] == -50
+        assert len(merge_strike_aggs([])) == 0
+
 
 class TestRegimeClassification:
     """Test regime classification functions"""
@@ -174,4 +305,29 @@ class TestRegimeClassification:
 
         # At threshold
         assert classify_regime(0.5, 0.5) == "o"
-        assert classify_regime(-0.5, 0.5) == "o"
\ No newline at end of file
+        assert classify_regime(-0.5, 0.5) == "o"
+
+    def test_vectorized_regime_classification(self):
+        """Test array classification matches the scalar version"""
+        values = [1.0, -1.0, 0.1, -0.1, 0.5, -0.5]
+        result = classify_regime_vec(values, 0.5)
+        assert list(result) == [classify_regime(v, 0.5) for v in values]
+
+    def test_strike_regimes_share_one_threshold(self):
+        """Test array regimes match per-strike regimes against all exposure values"""
+        gex = np.array([-1000.0, 20.0, 0.0])
+        dex = np.array([500.0, -300.0, 1.0])
+        vex = np.array([-200.0, 150.0, -2.0])
+        cex = np.array([100.0, -50.0, 40.0])
+        all_values = np.concatenate([gex, dex, vex, cex]).tolist()
+
+        results = classify_exposure_regimes(
+            gex, dex, vex, cex, calculate_neutral_threshold(all_values)
+        )
+
+        expected = [
+            classify_exposure_regime(g, d, v, c, all_values)
+            for g, d, v, c in zip(gex, dex, vex, cex)
+        ]
+        assert results == expected
+        assert results[2][1] == "Go Do Vo C+"
@@ -1,6 +1,11 @@
 import pytest
 import numpy as np
-from backend.greeks import calculate_greeks, calculate_time_to_expiration
+from datetime import datetime
+from scipy.stats import norm
+from backend.greeks import (
+    calculate_greeks, calculate_greeks_vec,
+    calculate_time_to_expiration, calculate_T_batch
+)
 from backend.models import Greeks
 
 
@@ -43,12 +48,82 @@ class TestGreeks:
         assert greeks.delta == 0
         assert greeks.gamma == 0
 
+        # NaN volatility
+        greeks = calculate_greeks(S=100, K=100, T=1, r=0.05, q=0, sigma=float("nan"), option_type="call")
+        assert greeks.delta == 0
+        assert greeks.gamma == 0
+
     def test_invalid_option_type(self):
         """Test invalid option type raises error"""
         with pytest.raises(ValueError):
             calculate_greeks(S=100, K=100, T=1, r=0.05, q=0, sigma=0.2, option_type="invalid")
 
 
+class TestCompiledKernel:
+    """Cross-check the compiled kernel against a scipy.stats reference"""
+
+    @staticmethod
+    def reference(S, K, T, r, q, sigma, option_type):
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+        d2 = d1 - sigma * np.sqrt(T)
+        sign = 1.0 if option_type == "call" else -1.0
+        delta = sign * np.exp(-q * T) * norm.cdf(sign * d1)
+        gamma = np.exp(-q * T) * norm.pdf(d1) / (S * sigma * np.sqrt(T))
+        vanna = sign * np.exp(-q * T) * norm.pdf(d1) * np.sqrt(T)
+        charm = -np.exp(-q * T) * norm.pdf(d1) * (
+            q + (r - q) * d1 / (sigma * np.sqrt(T)) - d2 * sigma / (2 * np.sqrt(T))
+        )
+        return delta, gamma, vanna, charm
+
+    @pytest.mark.parametrize("K,T,sigma,option_type", [
+        (100, 1.0, 0.2, "call"),
+        (100, 1.0, 0.2, "put"),
+        (80, 0.01, 0.35, "call"),
+        (125, 0.5, 0.15, "put"),
+    ])
+    def test_matches_reference(self, K, T, sigma, option_type):
+        """Test compiled Greeks match scipy.stats to 1e-12"""
+        greeks = calculate_greeks(
+            S=100, K=K, T=T, r=0.05, q=0.01, sigma=sigma, option_type=option_type
+        )
+        expected = self.reference(100, K, T, 0.05, 0.01, sigma, option_type)
+        actual = (greeks.delta, greeks.gamma, greeks.vanna, greeks.charm)
+        assert actual == pytest.approx(expected, rel=1e-12, abs=1e-12)
+
+
+class TestVectorizedGreeks:
+    """Test batched Black-Scholes Greeks"""
+
+    def test_matches_scalar(self):
+        """Test batched Greeks match the scalar calculation"""
+        K = np.array([90.0, 100.0, 110.0, 100.0])
+        T = np.array([0.5, 1.0, 0.25, 0.1])
+        sigma = np.array([0.25, 0.2, 0.3, 0.15])
+        is_call = np.array([True, False, True, False])
+
+        result = calculate_greeks_vec(100, K, T, 0.05, 0.01, sigma, is_call)
+
+        for i in range(len(K)):
+            expected = calculate_greeks(
+                S=100, K=K[i], T=T[i], r=0.05, q=0.01, sigma=sigma[i],
+                option_type="call" if is_call[i] else "put"
+            )
+            # Batched path runs in float32
+            assert result["delta"][i] == pytest.approx(expected.delta, rel=1e-5)
+            assert result["gamma"][i] == pytest.approx(expected.gamma, rel=1e-5)
+            assert result["vanna"][i] == pytest.approx(expected.vanna, rel=1e-5)
+            assert result["charm"][i] == pytest.approx(expected.charm, rel=1e-5)
+
+    def test_edge_cases(self):
+        """Test invalid rows return zero Greeks"""
+        result = calculate_greeks_vec(
+            100, np.array([100.0, 100.0]), np.array([0.0, 1.0]), 0.05, 0,
+            np.array([0.2, 0.0]), np.array([True, True])
+        )
+        assert np.all(result["delta"] == 0)
+        assert np.all(result["gamma"] == 0)
+
+
 class TestTimeCalculations:
     """Test time to expiration calculations"""
 
@@ -60,6 +135,21 @@ class TestTimeCalculations:
         assert isinstance(result, float)
         assert result >= 0
 
+    def test_explicit_now(self):
+        """Test calculation against a caller-supplied clock"""
+        result = calculate_time_to_expiration("2026-01-02", now=datetime(2026, 1, 1))
+        assert result == pytest.approx(1 / 365.25)
+
+    def test_batch_matches_scalar(self):
+        """Test batched times match the scalar calculation"""
+        now = datetime(2026, 1, 1, 12, 30)
+        dates = ["2026-01-02", "2026-06-19", "2025-12-31"]
+        result = calculate_T_batch(
+            np.array(dates, dtype="datetime64[D]"), np.datetime64(now)
+        )
+        for i, date in enumerate(dates):
+            assert result[i] == pytest.approx(calculate_time_to_expiration(date, now=now))
+
     def test_invalid_date(self):
         """Test invalid date returns 0"""
         result = calculate_time_to_expiration("invalid-date")
@@ -1,6 +1,48 @@
+from typing import List, Optional, TypedDict, Union
+import asyncio
+import logging
 import httpx
+import msgspec
+import orjson
 from backend.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Chain response schema, limited to the fields the backend reads. Decoding
+# against it skips every other Tradier field instead of materializing it
+class _ChainGreeks(TypedDict, total=False):
+    delta: Optional[float]
+    gamma: Optional[float]
+    theta: Optional[float]
+    vega: Optional[float]
+    mid_iv: Optional[float]
+    smv_vol: Optional[float]
+
+class _ChainOption(TypedDict, total=False):
+    symbol: Optional[str]
+    option_type: Optional[str]
+    strike: Optional[float]
+    bid: Optional[float]
+    ask: Optional[float]
+    last: Optional[float]
+    volume: Optional[int]
+    open_interest: Optional[int]
+    greeks: Optional[_ChainGreeks]
+
+class _ChainOptions(TypedDict, total=False):
+    option: Union[List[_ChainOption], _ChainOption]  # A lone option is not wrapped in a list
+
+class _ChainResponse(TypedDict, total=False):
+    options: Optional[_ChainOptions]
+
+_chain_decoder = msgspec.json.Decoder(_ChainResponse)
+
+# Transient failures worth retrying: dropped or reset responses and gateway
+# errors. Tradier GETs are idempotent, so a retry is always safe
+_RETRY_EXCEPTIONS = (httpx.ReadError, httpx.RemoteProtocolError)
+_RETRY_STATUSES = {502, 503, 504}
+_MAX_ATTEMPTS = 3
+
 class TradierClient:
     def __init__(self):
         self.base_url = "https://api.tradier.com/v1"
@@ -8,80 +50,120 @@ class TradierClient:
             "Authorization": f"Bearer {settings.tradier_token}",
             "Accept": "application/json"
         }
+        # One pooled client for every call, so the per-expiration fan-out
+        # multiplexes over a kept-alive HTTP/2 connection instead of paying a
+        # TLS handshake per request. The transport retries failed connects;
+        # _send retries dropped responses and gateway errors
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=64, max_connections=64, keepalive_expiry=30.0),
+                retries=2
+            ),
+            timeout=httpx.Timeout(connect=2.0, read=5.0, write=5.0, pool=1.0)
+        )
+        # Last expirations list and its ETag; a 304 revalidation reuses the list
+        self._expirations_etag: Optional[str] = None
+        self._expirations: Optional[list] = None
+
+        # Fixed-parameter requests are built once and re-sent unchanged,
+        # skipping URL, param and header merging on every call
+        self._quote_request = self._client.build_request("GET", "/markets/quotes", params={"symbols": "SPX"})
+        self._expirations_request = self._build_expirations_request()
+
+    def _build_expirations_request(self) -> httpx.Request:
+        # Conditional GET once Tradier has given us an ETag: an unchanged list
+        # costs a header-only 304 instead of a body download and parse
+        headers = {"If-None-Match": self._expirations_etag} if self._expirations_etag else None
+        params = {"symbol": "SPX", "includeAllRoots": "true", "strikes": "false"}
+        return self._client.build_request("GET", "/markets/options/expirations", params=params, headers=headers)
+
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        await self._client.aclose()
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        """Send a GET, retrying transient failures with exponential backoff"""
+        for attempt in range(_MAX_ATTEMPTS):
+            final = attempt == _MAX_ATTEMPTS - 1
+            try:
+                response = await self._client.send(request)
+            except _RETRY_EXCEPTIONS:
+                if final:
+                    raise
+            else:
+                if final or response.status_code not in _RETRY_STATUSES:
+                    return response
+            await asyncio.sleep(0.1 * 2 ** attempt)
 
     async def get_spx_quote(self) -> dict:
         """Get current SPX spot quote"""
-        url = f"{self.base_url}/markets/quotes"
-        params = {"symbols": "SPX"}
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            if "quotes" in data and "quote" in data["quotes"]:
-                quote = data["quotes"]["quote"]
-                return {
-                    "symbol": quote["symbol"],
-                    "last": quote["last"],
-                    "bid": quote.get("bid") or 0,  # Handle None values
-                    "ask": quote.get("ask") or 0,  # Handle None values
-                    "volume": quote.get("volume") or 0,
-                    "timestamp": str(quote.get("trade_date") or "")  # Ensure string
-                }
-            else:
-                raise ValueError("Invalid SPX quote response from Tradier")
+        response = await self._send(self._quote_request)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+
+        if "quotes" in data and "quote" in data["quotes"]:
+            quote = data["quotes"]["quote"]
+            # Prices are always floats here, whether Tradier sent an int or null
+            return {
+                "symbol": quote["symbol"],
+                "last": float(quote["last"]),
+                "bid": float(quote.get("bid") or 0.0),  # Handle None values
+                "ask": float(quote.get("ask") or 0.0),  # Handle None values
+                "volume": int(quote.get("volume") or 0),
+                "timestamp": str(quote.get("trade_date") or "")  # Ensure string
+            }
+        else:
+            raise ValueError("Invalid SPX quote response from Tradier")
 
     async def get_spx_expirations(self) -> list:
         """Get available SPX options expiration dates"""
-        url = f"{self.base_url}/markets/options/expirations"
-        params = {"symbol": "SPX", "includeAllRoots": "true", "strikes": "false"}
+        response = await self._send(self._expirations_request)
+        if response.status_code == 304 and self._expirations is not None:
+            return self._expirations
+        response.raise_for_status()
+        data = orjson.loads(response.content)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            if "expirations" in data and "date" in data["expirations"]:
-                dates = data["expirations"]["date"]
-                # Ensure we return a list of strings
-                if isinstance(dates, list):
-                    return dates
-                else:
-                    return [dates]
-            else:
-                raise ValueError("Invalid expirations response from Tradier")
+        if "expirations" in data and "date" in data["expirations"]:
+            dates = data["expirations"]["date"]
+            # Ensure we return a list of strings
+            if not isinstance(dates, list):
+                dates = [dates]
+            self._expirations = dates
+            etag = response.headers.get("etag")
+            if etag != self._expirations_etag:
+                self._expirations_etag = etag
+                self._expirations_request = self._build_expirations_request()
+            return dates
+        else:
+            raise ValueError("Invalid expirations response from Tradier")
 
     async def get_spx_chain(self, expiration: str) -> dict:
         """Get SPX options chain for specific expiration date"""
-        url = f"{self.base_url}/markets/options/chains"
         params = {
             "symbol": "SPX",
             "expiration": expiration,
             "greeks": "true"  # Request greeks data
         }
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            # Debug logging
-            if "options" in data and "option" in data["options"]:
-                options = data["options"]["option"]
-                if isinstance(options, list):
-                    print(f"🔍 Tradier returned {len(options)} options for {expiration}")
-                else:
-                    print(f"🔍 Tradier returned 1 option for {expiration}")
-            else:
-                print(f"🔍 Tradier returned no options for {expiration}")
-
-            if "options" in data and "option" in data["options"]:
-                options = data["options"]["option"]
-                # Ensure we return a list of options
-                if isinstance(options, list):
-                    return {"options": options}
-                else:
-                    return {"options": [options]}
-            else:
-                return {"options": []}  # Return empty list if no options found
\ No newline at end of file
+        response = await self._send(self._client.build_request("GET", "/markets/options/chains", params=params))
+        response.raise_for_status()
+        try:
+            data = _chain_decoder.decode(response.content)
+        except msgspec.ValidationError:
+            # A field arrived with an unexpected type; parse generically
+            # rather than dropping the whole chain
+            data = orjson.loads(response.content)
+
+        if "options" in data and "option" in data["options"]:
+            options = data["options"]["option"]
+            # Ensure we return a list of options
+            if not isinstance(options, list):
+                options = [options]
+        else:
+            options = []  # Return empty list if no options found
+
+        logger.debug("Tradier returned %d options for %s", len(options), expiration)
+        return {"options": options}
\ No newline at end of file